@@ -10,6 +10,7 @@ import argparse
 import shutil
 import sys
 import traceback
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
@@ -52,7 +53,7 @@ class AnonymizerCLI:
         processed_query = preprocess_text(query)
         anonymized_query = anonymizer.anonymize_query(processed_query)
         if auto_save:
-            anonymizer.save()
+            anonymizer.flush()
         return postprocess_text(anonymized_query)
 
     def deanonymize_query(
@@ -70,7 +71,7 @@ class AnonymizerCLI:
         anonymizer = self.setup_anonymizer(mapping_file, auto_save=auto_save)
         result = anonymizer.de_anonymize_query(query)
         if auto_save:
-            anonymizer.save()
+            anonymizer.flush()
         return result
 
     def process_file(
@@ -168,10 +169,7 @@ class AnonymizerCLI:
                 return True
             else:
                 # Save current state if file doesn't exist
-                temp_file = anonymizer.mapping_file
-                anonymizer.mapping_file = export_file
-                anonymizer.save()
-                anonymizer.mapping_file = temp_file
+                anonymizer.save(export_file)
                 print(f"Mappings exported to: {export_file}")
                 return True
         except Exception as e:
@@ -203,8 +201,12 @@ class AnonymizerCLI:
             return False
 
 
+@lru_cache(maxsize=1)
 def create_parser() -> argparse.ArgumentParser:
-    """Create and configure the argument parser."""
+    """
+    Create and configure the argument parser. The parser is built once and shared,
+    so callers should only parse with it and not add arguments.
+    """
     parser = argparse.ArgumentParser(
         description="SQL Query Anonymizer - Anonymize SQL queries while preserving structure",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -1,10 +1,19 @@
 import pickle
+import re
 import sys
 from pathlib import Path
 
 # Adjust sys.path to allow imports when running as a script
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# A line break followed by a line that starts with '--' (after indentation).
+# Leading with the literal newline lets the regex engine skip ahead quickly.
+_COMMENT_LINE_REGEX = re.compile(r"\n[^\S\n]*--[^\n]*")
+
+# Line boundaries recognised by str.splitlines() that text mode does not already
+# translate to '\n' (vertical tab, form feed, separators, NEL, LS, PS)
+_OTHER_LINE_BREAK_REGEX = re.compile("[\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
 
 def read_sql_file(filepath: str) -> str:
     """
@@ -19,12 +28,19 @@ def read_sql_file(filepath: str) -> str:
     with open(filepath, "r") as f:
         sql_statement = f.read()
 
-    # Ignore lines that start with '--' (SQL comments)
-    filtered_lines = [
-        line for line in sql_statement.splitlines() if not line.strip().startswith("--")
-    ]
+    # Lines are always re-joined with '\n'
+    sql_statement = _OTHER_LINE_BREAK_REGEX.sub("\n", sql_statement)
+
+    # A final line break does not start another line
+    sql_statement = sql_statement.removesuffix("\n")
+
+    # Nothing to strip, so skip the copies made for the regex pass
+    if "--" not in sql_statement:
+        return sql_statement
 
-    return "\n".join(filtered_lines)
+    # Ignore lines that start with '--' (SQL comments) in a single regex pass.
+    # The extra leading newline lets the first line match as well.
+    return _COMMENT_LINE_REGEX.sub("", "\n" + sql_statement)[1:]
 
 
 if __name__ == "__main__":
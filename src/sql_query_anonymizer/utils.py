@@ -1,16 +1,28 @@
 import pickle
 import re
+import sys
 from collections import Counter, defaultdict
+from collections.abc import Iterable
 from dataclasses import dataclass
-from enum import Enum, auto
+from enum import Enum, IntEnum, auto
+from itertools import pairwise
 from pathlib import Path
-from typing import List
-
-from .constants import ALL_SQL_FUNCTIONS, OP_PATTERN, SQL_KEYWORDS
+from types import TracebackType
+from typing import List, Self
+
+from .constants import (
+    ALL_SQL_FUNCTIONS,
+    MULTI_OPS,
+    OP_PATTERN,
+    SINGLE_OPS,
+    SQL_KEYWORDS,
+)
 from .helper_utilities import read_sql_file
 
 
-class TokenType(Enum):
+# An IntEnum hashes and compares in C; plain Enum members hash through a Python-level
+# __hash__, which every set and dict lookup keyed by token type would pay for
+class TokenType(IntEnum):
     FUNCTION = auto()
     KEYWORD = auto()
     TABLE = auto()
@@ -23,11 +35,103 @@ class TokenType(Enum):
     COMMENT = auto()
     UNKNOWN = auto()
 
+    # Keep str() as "TokenType.NAME" rather than IntEnum's bare number
+    __str__ = Enum.__str__
+
+
+TYPE_PREFIXES = frozenset({TokenType.TABLE, TokenType.IDENTIFIER, TokenType.LITERAL})
+
+# Placeholder prefix for each anonymized token type
+_PREFIX_BY_TYPE = {
+    TokenType.TABLE: "table",
+    TokenType.IDENTIFIER: "identifier",
+    TokenType.LITERAL: "literal",
+}
+
+# Every reserved word (keyword or function), uppercased
+_RESERVED_WORDS = frozenset(word.upper() for word in SQL_KEYWORDS | ALL_SQL_FUNCTIONS)
+
+# Token type of each reserved word; functions win over keywords of the same name
+_RESERVED_WORD_TYPES = {
+    **dict.fromkeys(SQL_KEYWORDS, TokenType.KEYWORD),
+    **dict.fromkeys(ALL_SQL_FUNCTIONS, TokenType.FUNCTION),
+}
+
+# Interned copies of uppercased reserved words and operators, so repeated tokens
+# share one string object instead of allocating a new one per match
+_INTERNED_RESERVED_WORDS = {word: sys.intern(word) for word in _RESERVED_WORDS}
+_INTERNED_SYMBOLS = {op: sys.intern(op) for op in MULTI_OPS + SINGLE_OPS}
+
+# Resolve regex group names (``match.lastgroup``) back to their TokenType
+_TOKEN_TYPES_BY_NAME = {token_type.name: token_type for token_type in TokenType}
+
+# Single-word keywords and functions are recognised by set lookups on matched
+# words; only multi-word keywords (e.g. GROUP BY) need a regex alternation.
+# Those starting with a function name (LEFT JOIN) are left out because the
+# function always took precedence over the keyword.
+_MULTI_WORD_KEYWORDS = sorted(
+    (
+        kw
+        for kw in SQL_KEYWORDS
+        if " " in kw and kw.split(" ", 1)[0] not in ALL_SQL_FUNCTIONS
+    ),
+    key=len,
+    reverse=True,
+)
+
+# Define regex patterns for each TokenType
+_TOKEN_SPECIFICATION = [
+    (
+        TokenType.KEYWORD,
+        r"\b(?:" + "|".join(map(re.escape, _MULTI_WORD_KEYWORDS)) + r")\b",
+    ),
+    # Any Unicode word that does not start with a digit
+    (TokenType.IDENTIFIER, r"\b[^\W\d]\w*\b"),
+    (TokenType.LITERAL, r"\'[^\']*\'|\"[^\"]*\"|\d+(\.\d+)?"),
+    (TokenType.SYMBOL, OP_PATTERN),
+    (TokenType.WHITESPACE, r"\s+"),
+    (TokenType.UNKNOWN, r"."),
+]
+
+# Keywords whose following identifier is a table name
+_TABLE_KEYWORDS = frozenset({"FROM", "JOIN", "INTO"})
+
+# A whole word where a table name is expected, so names such as 2024_sales that
+# start with a digit are not split into a number and an identifier
+_TABLE_NAME_REGEX = re.compile(r"\w+")
+
+# Combine patterns into a single regex, compiled once at import time
+_TOKEN_REGEX = re.compile(
+    "|".join(f"(?P<{tt.name}>{pattern})" for tt, pattern in _TOKEN_SPECIFICATION),
+    re.IGNORECASE,
+)
+
+# Multi-word keywords or any single word; words are uppercased only when they
+# are a keyword or function
+_KEYWORD_CASING_REGEX = re.compile(
+    r"\b(?:"
+    + "|".join(
+        map(
+            re.escape,
+            sorted((kw for kw in SQL_KEYWORDS if " " in kw), key=len, reverse=True),
+        )
+    )
+    + r")\b|\w+",
+    re.IGNORECASE,
+)
+
+# Most anonymized queries remembered per Anonymizer before the cache starts over
+_ANONYMIZE_CACHE_SIZE = 1024
+
+# Longer queries are not remembered, so a few large scripts cannot pin
+# megabytes of text in the cache
+_ANONYMIZE_CACHE_MAX_QUERY_LENGTH = 4096
 
-TYPE_PREFIXES = {TokenType.TABLE, TokenType.IDENTIFIER, TokenType.LITERAL}
+# A period with whitespace on both sides, as left by joining tokens with spaces
+_SPACED_PERIOD_REGEX = re.compile(r"\s+\.\s+")
 
 
-@dataclass
+@dataclass(slots=True)
 class Token:
     type: TokenType
     value: str
@@ -50,6 +154,13 @@ class Anonymizer:
         self.mappings: dict[TokenType, dict[str, str]] = defaultdict(dict)
         self.counters: dict[TokenType, int] = Counter()
         self.reverse_mappings: dict[TokenType, dict[str, str]] = defaultdict(dict)
+        # All reverse mappings in one dict; placeholders are unique across types
+        self._merged_reverse_mappings: dict[str, str] = {}
+        # Anonymized results by input query. Mappings only ever grow, so a query
+        # anonymizes the same way until they are cleared or reloaded.
+        self._anonymize_cache: dict[str, str] = {}
+        # Whether mappings changed since they were last loaded or saved
+        self._dirty: bool = False
 
         self.mapping_dir = Path.home() / ".sql_anonymizer"
         self.mapping_dir.mkdir(parents=True, exist_ok=True)
@@ -64,15 +175,11 @@ class Anonymizer:
             else:
                 self.mapping_file = self.mapping_dir / mapping_path
 
-    def _prefix(self, token_type: TokenType):
-        type_prefixes = {
-            TokenType.TABLE: "table",
-            TokenType.IDENTIFIER: "identifier",
-            TokenType.LITERAL: "literal",
-        }
-        if token_type not in type_prefixes:
-            raise ValueError(f"Unsupported token type: {token_type}")
-        return type_prefixes[token_type]
+    def _prefix(self, token_type: TokenType) -> str:
+        try:
+            return _PREFIX_BY_TYPE[token_type]
+        except KeyError:
+            raise ValueError(f"Unsupported token type: {token_type}") from None
 
     def get_or_assign(self, identifier: str, token_type: TokenType) -> str:
         # DEBUG: print the identifier and token type being processed
@@ -80,92 +187,130 @@ class Anonymizer:
 
         # Special handling for aliases - return as-is
         if token_type is TokenType.TABLE_ALIAS:
-            # Check if this alias was already created from a table/identifier
-            for table_mapping in self.mappings[TokenType.TABLE].values():
-                if identifier.lower() == table_mapping.split("_")[0].lower():
-                    return identifier  # Return original alias
             return identifier
 
         m = self.mappings[token_type]
-        if identifier in m:
-            return m[identifier]
+        # One lookup on the common path where the identifier is already mapped
+        prefix = m.get(identifier)
+        if prefix is not None:
+            return prefix
 
         self.counters[token_type] += 1
         prefix = f"{self._prefix(token_type)}_{self.counters[token_type]}"
         m[identifier] = prefix
 
         self.reverse_mappings[token_type][prefix] = identifier
+        self._merged_reverse_mappings[prefix] = identifier
+        self._dirty = True
 
         return prefix
 
     def anonymize_query(self, query: str) -> str:
-        tokens = tokenize_sql(query)
-
-        anonymized_tokens = []
-
-        for token in tokens:
-            if token.type in TYPE_PREFIXES:
-                anonymized_value = self.get_or_assign(token.value, token.type)
+        cached = self._anonymize_cache.get(query)
+        if cached is not None:
+            return cached
+
+        # Replacement values are joined directly; no intermediate Token list
+        get_or_assign = self.get_or_assign
+        anonymized = " ".join(
+            [
+                get_or_assign(token.value, token.type)
+                if token.type in TYPE_PREFIXES
+                else token.value
+                for token in tokenize_sql(query)
+            ]
+        )
+        if len(query) <= _ANONYMIZE_CACHE_MAX_QUERY_LENGTH:
+            if len(self._anonymize_cache) >= _ANONYMIZE_CACHE_SIZE:
+                self._anonymize_cache.clear()
+            self._anonymize_cache[query] = anonymized
+        return anonymized
 
-                # Check if new mapping was created
-                anonymized_tokens.append(
-                    Token(token.type, anonymized_value, token.space)
-                )
-            else:
-                anonymized_tokens.append(token)
+    def anonymize_many(self, queries: Iterable[str]) -> list[str]:
+        """
+        Anonymize a batch of queries against the shared mappings.
 
-        return " ".join(token.value for token in anonymized_tokens)
+        Queries are processed in order, so placeholder numbering is the same as
+        calling `anonymize_query` on each one in turn.
+        """
+        anonymize_query = self.anonymize_query
+        return [anonymize_query(query) for query in queries]
 
     def de_anonymize_query(self, anonymized_query: str) -> str:
-        tokens = tokenize_sql(anonymized_query)
-
-        de_anonymized_tokens = []
-        for token in tokens:
-            # Check if this token value exists in any of the reverse mappings
-            original_value = None
-            original_type = None
-
-            # Check all TYPE_PREFIXES for the token value, regardless of current token type
-            for check_type in TYPE_PREFIXES:
-                if token.value in self.reverse_mappings[check_type]:
-                    original_value = self.reverse_mappings[check_type][token.value]
-                    original_type = check_type
-                    break
+        # Look up every token value in the reverse mappings, regardless of token type
+        merged_reverse_mappings = self._merged_reverse_mappings
+        return " ".join(
+            [
+                merged_reverse_mappings.get(token.value, token.value)
+                for token in tokenize_sql(anonymized_query)
+            ]
+        )
 
-            if original_value is not None and original_type is not None:
-                de_anonymized_tokens.append(
-                    Token(original_type, original_value, token.space)
-                )
-            else:
-                de_anonymized_tokens.append(token)
+    def _rebuild_merged_reverse_mappings(self) -> None:
+        self._merged_reverse_mappings = {
+            placeholder: original
+            for token_type in TYPE_PREFIXES
+            for placeholder, original in self.reverse_mappings.get(
+                token_type, {}
+            ).items()
+        }
 
-        return " ".join(token.value for token in de_anonymized_tokens)
+    def loads(self, data: bytes) -> None:
+        """Replace the mappings with a state serialized by `dumps` or `save`."""
+        state = pickle.loads(data)
+        # Read every key before assigning, so a malformed state changes nothing
+        mappings = state["mappings"]
+        reverse_mappings = state["reverse_mappings"]
+        counters = state["counters"]
+
+        self._anonymize_cache.clear()
+        self.mappings = mappings
+        self.reverse_mappings = reverse_mappings
+        self.counters = counters
+        self._rebuild_merged_reverse_mappings()
+        self._dirty = False
+
+    def dumps(self) -> bytes:
+        """Serialize the mappings to bytes in the same format as the mapping file."""
+        state = {
+            "mappings": self.mappings,
+            "reverse_mappings": self.reverse_mappings,
+            "counters": self.counters,
+        }
+        return pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
 
-    def load(self):
+    def load(self) -> None:
         try:
             with open(self.mapping_file, "rb") as f:
-                state = pickle.load(f)
-            self.mappings = state["mappings"]
-            self.reverse_mappings = state["reverse_mappings"]
-            self.counters = state["counters"]
+                data = f.read()
+            self.loads(data)
         except (FileNotFoundError, pickle.UnpicklingError, EOFError, KeyError):
             # If the mapping file is missing, corrupted, or malformed, ignore and start fresh.
             pass
 
-    def save(self):
-        state = {
-            "mappings": self.mappings,
-            "reverse_mappings": self.reverse_mappings,
-            "counters": self.counters,
-        }
-        with open(self.mapping_file, "wb") as f:
-            pickle.dump(state, f)
+    def save(self, path: str | Path | None = None) -> None:
+        """Save mappings to `path`, or to the mapping file by default."""
+        with open(self.mapping_file if path is None else path, "wb") as f:
+            f.write(self.dumps())
+        # Only a save to the mapping file brings it up to date
+        if path is None:
+            self._dirty = False
 
-    def __enter__(self):
+    def flush(self) -> None:
+        """Save mappings only if they changed since the last load or save."""
+        if self._dirty:
+            self.save()
+
+    def __enter__(self) -> Self:
         self.load()
         return self
 
-    def __exit__(self, exc_type, exc, tb):
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> bool:
         if exc_type is None:
             try:
                 self.save()
@@ -202,23 +347,22 @@ class Anonymizer:
         tokens = tokenize_sql(query)
         aliases_before_periods = {}
         table_aliases_found = set()
+        total_references = 0
 
         # Debug: print tokens to see structure
         # for i, token in enumerate(tokens):
         #     print(f"{i}: {token.type} -> '{token.value}'")
 
-        for i, token in enumerate(tokens):
-            # Look for pattern: IDENTIFIER followed by SYMBOL "."
+        # Look for pattern: IDENTIFIER followed by SYMBOL "."
+        for token, next_token in pairwise(tokens):
             if (
-                token.type in [TokenType.IDENTIFIER, TokenType.TABLE_ALIAS]
-                and i + 1 < len(tokens)
-                and tokens[i + 1].type == TokenType.SYMBOL
-                and tokens[i + 1].value == "."
+                next_token.value == "."
+                and next_token.type == TokenType.SYMBOL
+                and token.type in {TokenType.IDENTIFIER, TokenType.TABLE_ALIAS}
             ):
                 alias = token.value
-                if alias not in aliases_before_periods:
-                    aliases_before_periods[alias] = 0
-                aliases_before_periods[alias] += 1
+                aliases_before_periods[alias] = aliases_before_periods.get(alias, 0) + 1
+                total_references += 1
 
                 # Mark as table alias if not already marked
                 if token.type == TokenType.IDENTIFIER:
@@ -227,7 +371,7 @@ class Anonymizer:
         return {
             "aliases_count": len(aliases_before_periods),
             "aliases": aliases_before_periods,
-            "total_references": sum(aliases_before_periods.values()),
+            "total_references": total_references,
             "table_aliases_detected": list(table_aliases_found),
         }
 
@@ -239,64 +383,109 @@ class Anonymizer:
 
     def _extract_table_aliases_info(self, query: str) -> list:
         """Extract information about table aliases from a query."""
-        tokens = tokenize_sql(query)
-        aliases = []
-
-        for token in tokens:
-            if token.type == TokenType.TABLE_ALIAS:
-                aliases.append(token.value)
-
-        return list(set(aliases))  # Remove duplicates
+        # Collect into a set to remove duplicates
+        return list(
+            {
+                token.value
+                for token in tokenize_sql(query)
+                if token.type == TokenType.TABLE_ALIAS
+            }
+        )
 
     def _decode_partial_text(self, text: str) -> str:
         """
         Decode partial anonymized text - useful for decoding individual identifiers.
         """
-        # Check if the text matches any anonymized pattern
-        for token_type in TYPE_PREFIXES:
-            if text in self.reverse_mappings[token_type]:
-                return self.reverse_mappings[token_type][text]
-        return text  # Return original if not found in mappings
+        # Return original if not found in mappings
+        return self._merged_reverse_mappings.get(text, text)
 
     def clear_mappings(self) -> None:
         self.mappings = defaultdict(dict)
         self.reverse_mappings = defaultdict(dict)
+        self._merged_reverse_mappings = {}
+        self._anonymize_cache.clear()
         self.counters = Counter()
+        self._dirty = True
+
+
+def _find_closing_quote(text: str, start: int) -> int:
+    """
+    Return the index just past the quote closing the string opened at `start`,
+    or -1 if it is never closed. A backslash escapes the character after it,
+    except a newline.
+    """
+    quote = text[start]
+    pos = start + 1
+    close = text.find(quote, pos)
+    while close != -1:
+        # Backslashes are only searched for up to the candidate closing quote,
+        # and each search starts past the previous escape
+        escape = text.find("\\", pos, close)
+        if escape == -1:
+            return close + 1
+        if text[escape + 1] == "\n":
+            return -1
+        pos = escape + 2
+        if close < pos:
+            # The candidate was the escaped character
+            close = text.find(quote, pos)
+    return -1
 
 
 def normalize_casing(text: str) -> str:
-    def ignore_within_quotes(match):
-        return match.group(0)
-
-    # Regex to match text outside quotes
-    pattern = r"""
-        (?<!\\)            # Negative lookbehind to ensure no backslash precedes
-        "(?:\\.|[^"\\])*"  # Match double-quoted strings, allowing escaped quotes
-        |                  # OR
-        '(?:\\.|[^'\\])*'  # Match single-quoted strings, allowing escaped quotes
-        |                  # OR
-        ([^'"]+)           # Match any text outside quotes
     """
-    return re.sub(
-        pattern,
-        lambda m: (
-            ignore_within_quotes(m)
-            if m.group(0).startswith(("'", '"'))
-            else m.group(0).lower()
-        ),
-        text,
-        flags=re.VERBOSE,
-    )
+    Lowercase everything outside of quoted strings.
+
+    Quoted strings are located with `str.find` and copied verbatim, so the text
+    is walked once without a regex callback per segment. A double quote preceded
+    by a backslash and quotes that are never closed are treated as plain text.
+    """
+    parts = []
+    start = 0  # Beginning of the pending unquoted run
+    # Next quote of each kind at or after `start`; a kind is searched for again
+    # only once the scan has moved past it, so the text is walked once
+    single = text.find("'")
+    double = text.find('"')
+    while single != -1 or double != -1:
+        if double == -1 or (single != -1 and single < double):
+            quote_pos = single
+        else:
+            quote_pos = double
+
+        end = -1
+        if not (text[quote_pos] == '"' and text[quote_pos - 1 : quote_pos] == "\\"):
+            end = _find_closing_quote(text, quote_pos)
+
+        parts.append(text[start:quote_pos].lower())
+        if end == -1:
+            # Unmatched quote character: keep it and continue scanning after it
+            parts.append(text[quote_pos])
+            start = quote_pos + 1
+        else:
+            parts.append(text[quote_pos:end])
+            start = end
+
+        if single != -1 and single < start:
+            single = text.find("'", start)
+        if double != -1 and double < start:
+            double = text.find('"', start)
+
+    parts.append(text[start:].lower())
+    return "".join(parts)
 
 
 def collapse_extra_spaces(text: str) -> str:
-    return " ".join(re.split(r"\s+", text.strip()))
+    # str.split() with no separator splits on runs of whitespace and drops the ends
+    return " ".join(text.split())
+
+
+def _upper_if_reserved(match: re.Match) -> str:
+    word = match.group(0)
+    return _INTERNED_RESERVED_WORDS.get(word.upper(), word)
 
 
 def normalize_keyword_casing(text: str) -> str:
-    sorted_keywords = sorted(SQL_KEYWORDS | ALL_SQL_FUNCTIONS, key=len, reverse=True)
-    pattern = r"\b(?:" + "|".join(map(re.escape, sorted_keywords)) + r")\b"
-    return re.sub(pattern, lambda m: m.group(0).upper(), text, flags=re.IGNORECASE)
+    return _KEYWORD_CASING_REGEX.sub(_upper_if_reserved, text)
 
 
 def tokenize_sql(query: str) -> List[Token]:
@@ -320,121 +509,119 @@ def tokenize_sql(query: str) -> List[Token]:
           are defined elsewhere in the code.
         - The `KEYWORDS` variable should contain a regex pattern for SQL keywords.
     """
-    tokens = []
+    return _post_process_tokens(_scan_tokens(query))
 
-    # Sort by length to match longer keywords first and avoid partial matches
-    escaped_functions = sorted(
-        [re.escape(func) for func in ALL_SQL_FUNCTIONS], key=len, reverse=True
-    )
-    escaped_keywords = sorted(
-        [re.escape(kw) for kw in SQL_KEYWORDS], key=len, reverse=True
-    )
 
-    # Define regex patterns for each TokenType
-    token_specification = [
-        (TokenType.FUNCTION, r"\b(?:" + "|".join(escaped_functions) + r")\b"),
-        (TokenType.KEYWORD, r"\b(?:" + "|".join(escaped_keywords) + r")\b"),
-        (TokenType.TABLE, r"(?<=(FROM|JOIN|INTO)\s)\w+"),
-        (TokenType.TABLE_ALIAS, r"(?<=(FROM|JOIN|INTO)\s)\w+\s(\w+)"),
-        (TokenType.IDENTIFIER, r"\b[a-zA-Z_][a-zA-Z0-9_]*\b"),
-        (TokenType.LITERAL, r"\'[^\']*\'|\"[^\"]*\"|\d+(\.\d+)?"),
-        (TokenType.SYMBOL, OP_PATTERN),
-        (TokenType.WHITESPACE, r"\s+"),
-        (TokenType.UNKNOWN, r"."),
-    ]
+def _scan_tokens(query: str, uppercase_reserved: bool = False) -> list[Token]:
+    """
+    Split a query into tokens with the master regex, before any alias detection.
+    With `uppercase_reserved`, keyword and function values are uppercased as
+    they are matched.
+    """
+    tokens = []
+    pos = 0
+
+    # Match tokens in the query. The scan only restarts, at `pos`, after a table
+    # name that starts with a digit has been taken as one word.
+    while True:
+        for match in _TOKEN_REGEX.finditer(query, pos):
+            token_type = _TOKEN_TYPES_BY_NAME[match.lastgroup]
+            if token_type is TokenType.WHITESPACE:
+                continue
+            # Each alternative is a single named group, so it spans the whole match
+            value = match.group()
+            if token_type is TokenType.IDENTIFIER:
+                word = value.upper()
+                token_type = _RESERVED_WORD_TYPES.get(word, token_type)
+                if uppercase_reserved and token_type is not TokenType.IDENTIFIER:
+                    value = _INTERNED_RESERVED_WORDS[word]
+            elif token_type is TokenType.SYMBOL:
+                value = _INTERNED_SYMBOLS[value]
+            elif uppercase_reserved and token_type is TokenType.KEYWORD:
+                value = _INTERNED_RESERVED_WORDS[value.upper()]
+            elif token_type is TokenType.LITERAL and _expects_table_name(tokens):
+                name_match = _TABLE_NAME_REGEX.match(query, match.start())
+                if name_match is not None and name_match.end() > match.end():
+                    tokens.append(
+                        Token(
+                            type=TokenType.IDENTIFIER,
+                            value=name_match.group(),
+                            space=False,
+                        )
+                    )
+                    pos = name_match.end()
+                    break
+            tokens.append(Token(type=token_type, value=value, space=False))
+        else:
+            return tokens
+
 
-    # Combine patterns into a single regex
-    regex = re.compile(
-        "|".join(f"(?P<{tt.name}>{pattern})" for tt, pattern in token_specification),
-        re.IGNORECASE,
+def _is_table_keyword(token: Token) -> bool:
+    # Multi-word keywords such as INNER JOIN or INSERT INTO count by their last word
+    return (
+        token.type == TokenType.KEYWORD
+        and token.value.upper().rpartition(" ")[2] in _TABLE_KEYWORDS
     )
 
-    # Match tokens in the query
-    for match in regex.finditer(query):
-        for token_type in TokenType:
-            if match.lastgroup == token_type.name:
-                value = match.group(token_type.name)
-                if token_type != TokenType.WHITESPACE:
-                    tokens.append(Token(type=token_type, value=value, space=False))
-                break
 
-    return _post_process_tokens(tokens)
+def _expects_table_name(tokens: list[Token]) -> bool:
+    """Whether the next word is a table name: after FROM/JOIN/INTO, or after `schema.` there."""
+    if not tokens:
+        return False
+    if _is_table_keyword(tokens[-1]):
+        return True
+    return (
+        len(tokens) >= 3 and tokens[-1].value == "." and _is_table_keyword(tokens[-3])
+    )
 
 
 def _post_process_tokens(tokens: List[Token]) -> List[Token]:
-    table_aliases = set()
-    aliases_before_periods = set()
-
-    # First pass: identify all identifiers that precede literal periods
-    # This is the key enhancement to quantify table aliases before periods
+    # Single forward pass: every rule only looks one token back, at a token that
+    # is already final, and one token ahead, at a token not yet rewritten.
+    # _scan_tokens already turned every reserved word into a KEYWORD or FUNCTION,
+    # so IDENTIFIER values need no further reserved-word checks here.
+    last_index = len(tokens) - 1
+    prev_token = None
     for i, token in enumerate(tokens):
+        next_token = tokens[i + 1] if i < last_index else None
+
+        # Table names follow FROM/JOIN/INTO
         if (
             token.type == TokenType.IDENTIFIER
-            and i + 1 < len(tokens)
-            and tokens[i + 1].type == TokenType.SYMBOL
-            and tokens[i + 1].value == "."
+            and prev_token is not None
+            and _is_table_keyword(prev_token)
         ):
-            aliases_before_periods.add(token.value.lower())
+            token = tokens[i] = Token(TokenType.TABLE, token.value, token.space)
 
-    # Second pass: identify formal table aliases (after FROM/JOIN/INTO keywords)
-    for i, token in enumerate(tokens):
-        if token.type == TokenType.TABLE and i + 1 < len(tokens):
-            next_token = tokens[i + 1]
-            if (
-                next_token.type == TokenType.IDENTIFIER
-                and next_token.value.upper() not in SQL_KEYWORDS
-                and next_token.value.upper() not in ALL_SQL_FUNCTIONS
-            ):
-                table_aliases.add(next_token.value.lower())
+        if token.type == TokenType.TABLE:
+            # Detect formal table aliases (identifier right after a table name)
+            if next_token is not None and next_token.type == TokenType.IDENTIFIER:
                 tokens[i + 1] = Token(
                     TokenType.TABLE_ALIAS, next_token.value, next_token.space
                 )
 
         # Detect column aliases (after AS keyword)
-        elif (
-            token.type == TokenType.KEYWORD
-            and token.value.upper() == "AS"
-            and i + 1 < len(tokens)
-        ):
-            next_token = tokens[i + 1]
-            if (
-                next_token.type == TokenType.IDENTIFIER
-                and next_token.value.upper() not in SQL_KEYWORDS
-                and next_token.value.upper() not in ALL_SQL_FUNCTIONS
-            ):
+        elif token.type == TokenType.KEYWORD and token.value.upper() == "AS":
+            if next_token is not None and next_token.type == TokenType.IDENTIFIER:
                 tokens[i + 1] = Token(
                     TokenType.IDENTIFIER_ALIAS, next_token.value, next_token.space
                 )
 
-        # Detect implicit column aliases (identifier after column in SELECT)
-        elif token.type == TokenType.IDENTIFIER and i > 0 and i + 1 < len(tokens):
-            prev_token = tokens[i - 1]
-            next_token = tokens[i + 1]
+        elif token.type == TokenType.IDENTIFIER and next_token is not None:
+            # Any identifier that precedes a period is a table alias reference
+            if next_token.type == TokenType.SYMBOL and next_token.value == ".":
+                tokens[i] = Token(TokenType.TABLE_ALIAS, token.value, token.space)
 
+            # Detect implicit column aliases (identifier after column in SELECT)
             # Simple heuristic: if identifier follows another identifier/function and precedes comma/FROM
-            if (
-                prev_token.type in {TokenType.IDENTIFIER, TokenType.FUNCTION}
+            elif (
+                prev_token is not None
+                and prev_token.type in {TokenType.IDENTIFIER, TokenType.FUNCTION}
                 and next_token.value in {",", "FROM"}
-                and token.value.upper() not in SQL_KEYWORDS
-                and token.value.upper() not in ALL_SQL_FUNCTIONS
             ):
                 tokens[i] = Token(TokenType.IDENTIFIER_ALIAS, token.value, token.space)
 
-    # Third pass: identify table alias references with enhanced logic
-    # This includes both formally declared aliases and any identifier that precedes a period
-    for i, token in enumerate(tokens):
-        if (
-            token.type == TokenType.IDENTIFIER
-            and i + 1 < len(tokens)
-            and tokens[i + 1].type == TokenType.SYMBOL
-            and tokens[i + 1].value == "."
-        ):
-            # If it's a formally declared alias OR if it precedes a period, treat as table alias
-            if (
-                token.value.lower() in table_aliases
-                or token.value.lower() in aliases_before_periods
-            ):
-                tokens[i] = Token(TokenType.TABLE_ALIAS, token.value, token.space)
+        prev_token = tokens[i]
 
     return tokens
 
@@ -442,15 +629,16 @@ def _post_process_tokens(tokens: List[Token]) -> List[Token]:
 def preprocess_text(text: str) -> str:
     text = normalize_casing(text)
     text = collapse_extra_spaces(text)
-    text = normalize_keyword_casing(text)
-    tokens = tokenize_sql(text)
-    text = " ".join(token.value for token in tokens)
+    # Keywords and functions are uppercased while tokenizing, so quoted literals
+    # keep their original casing. Only the values are used, so the alias
+    # detection in _post_process_tokens is skipped.
+    tokens = _scan_tokens(text, uppercase_reserved=True)
+    text = " ".join([token.value for token in tokens])
     return text
 
 
 def postprocess_text(text: str) -> str:
-    text = re.sub(r"\s+\.\s+", ".", text)
-    return text
+    return _SPACED_PERIOD_REGEX.sub(".", text)
 
 
 def demonstrate_serialization_workflow():
@@ -0,0 +1,11 @@
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _isolate_home(tmp_path_factory):
+    """Keep the default ~/.sql_anonymizer mapping file out of the real home directory."""
+    home = tmp_path_factory.mktemp("home")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("HOME", str(home))
+        monkeypatch.setenv("USERPROFILE", str(home))
+        yield home
@@ -1,3 +1,6 @@
+import pickle
+from functools import lru_cache
+
 import pytest
 
 from src.sql_query_anonymizer.utils import (
@@ -8,13 +11,28 @@ from src.sql_query_anonymizer.utils import (
 )
 
 
-@pytest.fixture
-def anonymizer():
-    """Fixture to provide a fresh Anonymizer instance for each test."""
+@pytest.fixture(scope="session")
+def _shared_anonymizer():
+    """Single Anonymizer instance reused across the session."""
     return Anonymizer()
 
 
 @pytest.fixture
+def anonymizer(_shared_anonymizer):
+    """Fixture to provide an Anonymizer with empty mappings for each test."""
+    mapping_file = _shared_anonymizer.mapping_file
+    _shared_anonymizer.clear_mappings()
+    yield _shared_anonymizer
+    _shared_anonymizer.mapping_file = mapping_file
+
+
+@pytest.fixture(scope="session")
+def pp():
+    """Fixture providing preprocess_text memoized for the whole session."""
+    return lru_cache(maxsize=128)(preprocess_text)
+
+
+@pytest.fixture(scope="session")
 def sample_queries():
     """Fixture providing various SQL queries for testing."""
     return {
@@ -33,7 +51,7 @@ def sample_queries():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def expected_anonymized():
     """Fixture providing expected anonymized results for validation."""
     return {
@@ -42,12 +60,23 @@ def expected_anonymized():
     }
 
 
+@pytest.fixture(scope="module")
+def anonymized_pairs(sample_queries, pp):
+    """Anonymizer plus (preprocessed, anonymized) pairs for every sample query."""
+    anonymizer = Anonymizer()
+    pairs = {}
+    for key, query in sample_queries.items():
+        processed_query = pp(query)
+        pairs[key] = (processed_query, anonymizer.anonymize_query(processed_query))
+    return anonymizer, pairs
+
+
 class TestAnonymize:
-    def test_anonymize(self):
+    def test_anonymize(self, pp):
         """Main test function - covers basic anonymization functionality."""
         anonymizer = Anonymizer()
         query = "SELECT name, age FROM users WHERE id = 1"
-        processed_query = preprocess_text(query)
+        processed_query = pp(query)
         anonymized = anonymizer.anonymize_query(processed_query)
 
         # Basic checks
@@ -60,13 +89,10 @@ class TestAnonymize:
     @pytest.mark.parametrize(
         "query_key", ["simple_select", "with_joins", "complex_query", "with_literals"]
     )
-    def test_anonymize_different_query_types(
-        self, anonymizer, sample_queries, query_key
-    ):
+    def test_anonymize_different_query_types(self, anonymized_pairs, query_key):
         """Parameterized test for different types of SQL queries."""
-        query = sample_queries[query_key]
-        processed_query = preprocess_text(query)
-        anonymized = anonymizer.anonymize_query(processed_query)
+        _, pairs = anonymized_pairs
+        processed_query, anonymized = pairs[query_key]
 
         # Basic assertions that should hold for all queries
         assert len(anonymized) > 0
@@ -79,33 +105,58 @@ class TestAnonymize:
         # At least some transformation should have occurred
         assert original_tokens != anonymized_tokens
 
+    def test_anonymize_many(self, anonymizer, sample_queries):
+        """Batch anonymization matches anonymizing each query in turn."""
+        queries = list(sample_queries.values())
+        sequential = Anonymizer()
+        expected = [sequential.anonymize_query(query) for query in queries]
+
+        assert anonymizer.anonymize_many(queries) == expected
+        assert anonymizer.mappings == sequential.mappings
+
+    def test_anonymize_repeated_query(self, anonymizer):
+        """Repeated queries reuse their result until mappings are cleared."""
+        anonymizer.anonymize_query("SELECT name FROM users")
+        query = "SELECT id FROM orders"
+        anonymized = anonymizer.anonymize_query(query)
+
+        assert anonymizer.anonymize_query(query) == anonymized
+        anonymizer.clear_mappings()
+        assert anonymizer.anonymize_query(query) == "SELECT identifier_1 FROM table_1"
+
+    def test_clear_mappings_keeps_previous_references(self, anonymizer):
+        """Clearing replaces the mappings, so earlier references keep their contents."""
+        anonymizer.anonymize_query("SELECT name FROM users")
+        mappings = anonymizer.mappings
+
+        anonymizer.clear_mappings()
+
+        assert mappings[TokenType.TABLE] == {"users": "table_1"}
+        assert len(anonymizer.mappings) == 0
+
 
 class TestDeanonymize:
     @pytest.mark.parametrize(
         "query_key", ["simple_select", "with_joins", "with_literals", "with_functions"]
     )
-    def test_deanonymize_various_queries(self, anonymizer, sample_queries, query_key):
+    def test_deanonymize_various_queries(self, anonymized_pairs, query_key):
         """Parameterized test for de-anonymization of various query types."""
-        original_query = sample_queries[query_key]
-        processed_query = preprocess_text(original_query)
-
-        anonymized = anonymizer.anonymize_query(processed_query)
+        anonymizer, pairs = anonymized_pairs
+        processed_query, anonymized = pairs[query_key]
         deanonymized = anonymizer.de_anonymize_query(anonymized)
 
-        # Normalize whitespace
-        original_normalized = " ".join(processed_query.split())
-        deanonymized_normalized = " ".join(deanonymized.split())
-
-        assert original_normalized == deanonymized_normalized
+        # Tokens are joined with single spaces, so the round trip is exact
+        assert "  " not in anonymized
+        assert deanonymized == processed_query
 
 
 class TestSerialization:
     """Test class for serialization and deserialization functionality."""
 
-    def test_serialize_anonymized_query(self, anonymizer, tmp_path):
+    def test_serialize_anonymized_query(self, anonymizer, tmp_path, pp):
         """Test serialization of anonymized query with mappings using pickle."""
         original_query = "SELECT c.name FROM customers c WHERE c.id = 1"
-        processed_query = preprocess_text(original_query)
+        processed_query = pp(original_query)
         anonymized_query = anonymizer.anonymize_query(processed_query)
 
         # Save mappings using the new pickle-based approach
@@ -128,22 +179,18 @@ class TestSerialization:
         decoded = new_anonymizer.de_anonymize_query(anonymized_query)
         assert "name" in decoded.lower() or "customers" in decoded.lower()
 
-    def test_deserialize_and_decode(self, anonymizer, tmp_path):
+    def test_deserialize_and_decode(self, anonymizer, pp):
         """Test deserialization and decoding functionality using pickle."""
         original_query = (
             "SELECT u.name, o.total FROM users u JOIN orders o ON u.id = o.user_id"
         )
-        processed_query = preprocess_text(original_query)
+        processed_query = pp(original_query)
         anonymized_query = anonymizer.anonymize_query(processed_query)
 
-        # Save mappings
-        serialization_file = tmp_path / "test_deserialize.pkl"
-        anonymizer.mapping_file = serialization_file
-        anonymizer.save()
-
-        # Create new anonymizer and load mappings
-        new_anonymizer = Anonymizer(mapping_file=str(serialization_file))
-        new_anonymizer.load()
+        # Serialize mappings and load them into a new anonymizer
+        data = anonymizer.dumps()
+        new_anonymizer = Anonymizer()
+        new_anonymizer.loads(data)
 
         # Test that mappings were loaded
         assert len(new_anonymizer.mappings) > 0
@@ -151,13 +198,55 @@ class TestSerialization:
 
         # Test decoding functionality
         decoded_query = new_anonymizer.de_anonymize_query(anonymized_query)
-        original_normalized = " ".join(processed_query.split())
-        decoded_normalized = " ".join(decoded_query.split())
-        assert original_normalized == decoded_normalized
+        assert decoded_query == processed_query
+
+    def test_load_ignores_incomplete_state(self, anonymizer, tmp_path):
+        """A mapping file missing a key leaves the current mappings untouched."""
+        anonymized_query = anonymizer.anonymize_query("SELECT name FROM users")
+        mapping_file = tmp_path / "incomplete.pkl"
+        mapping_file.write_bytes(pickle.dumps({"mappings": {}, "reverse_mappings": {}}))
+
+        anonymizer.mapping_file = mapping_file
+        anonymizer.load()
+
+        assert anonymizer.mappings[TokenType.TABLE] == {"users": "table_1"}
+        assert (
+            anonymizer.de_anonymize_query(anonymized_query) == "SELECT name FROM users"
+        )
+
+    def test_flush_saves_only_changes(self, tmp_path):
+        """flush writes the mapping file only when new mappings were added."""
+        mapping_file = tmp_path / "flush_test.pkl"
+        anonymizer = Anonymizer(mapping_file=str(mapping_file))
 
-    def test_process_optimized_query(self, anonymizer):
+        anonymizer.anonymize_query("SELECT name FROM users")
+        anonymizer.flush()
+        assert mapping_file.exists()
+
+        mapping_file.unlink()
+        anonymizer.anonymize_query("SELECT name FROM users")
+        anonymizer.flush()
+        assert not mapping_file.exists()
+
+        anonymizer.anonymize_query("SELECT email FROM users")
+        anonymizer.flush()
+        assert mapping_file.exists()
+
+    def test_save_elsewhere_keeps_changes_pending(self, tmp_path):
+        """Saving to another path does not stop flush from updating the mapping file."""
+        mapping_file = tmp_path / "mappings.pkl"
+        anonymizer = Anonymizer(mapping_file=str(mapping_file))
+
+        anonymizer.anonymize_query("SELECT name FROM users")
+        anonymizer.save(tmp_path / "export.pkl")
+        assert not mapping_file.exists()
+
+        anonymizer.flush()
+        assert mapping_file.exists()
+
+    def test_process_optimized_query(self, anonymizer, pp):
         original_query = "SELECT name FROM users WHERE active = 1"
-        processed_query = preprocess_text(original_query)
+        processed_query = pp(original_query)
         anonymized_query = anonymizer.anonymize_query(processed_query)
 
         # Simulate optimization (add hints)
@@ -171,10 +260,10 @@ class TestSerialization:
         assert "users" in decoded_optimized
         assert "INDEX" in decoded_optimized  # The comment content should be there
 
-    def test_table_aliases_quantification(self, anonymizer):
+    def test_table_aliases_quantification(self, anonymizer, pp):
         """Test quantification of table aliases that precede periods."""
         query = "SELECT c.name, c.email, o.total FROM customers c JOIN orders o ON c.id = o.customer_id"
-        processed_query = preprocess_text(query)
+        processed_query = pp(query)
 
         alias_info = anonymizer.get_table_aliases_quantification(processed_query)
 
@@ -186,16 +275,14 @@ class TestSerialization:
         assert alias_info["aliases"]["o"] == 2  # o.total, o.customer_id
         assert alias_info["total_references"] == 5
 
-    def test_serialization_roundtrip_with_optimization(self, anonymizer, tmp_path):
+    def test_serialization_roundtrip_with_optimization(self, anonymizer, pp):
         """Test complete workflow: serialize -> optimize -> decode using pickle."""
         original_query = "SELECT p.name, c.title FROM products p JOIN categories c ON p.category_id = c.id"
-        processed_query = preprocess_text(original_query)
+        processed_query = pp(original_query)
         anonymized_query = anonymizer.anonymize_query(processed_query)
 
-        # Save mappings
-        serialization_file = tmp_path / "roundtrip_test.pkl"
-        anonymizer.mapping_file = serialization_file
-        anonymizer.save()
+        # Serialize mappings
+        data = anonymizer.dumps()
 
         # Simulate query optimization
         optimized_anonymized = anonymized_query.replace(
@@ -203,8 +290,8 @@ class TestSerialization:
         )
 
         # Load mappings and decode optimized query
-        new_anonymizer = Anonymizer(mapping_file=str(serialization_file))
-        new_anonymizer.load()
+        new_anonymizer = Anonymizer()
+        new_anonymizer.loads(data)
         final_decoded = new_anonymizer.de_anonymize_query(optimized_anonymized)
 
         # Should contain original identifiers and optimization hints
@@ -232,8 +319,8 @@ class TestEdgeCases:
         )
     ],
 )
-def test_anonymizer_long_query(query, expected_output):
-    processed_sample = preprocess_text(query)
+def test_anonymizer_long_query(query, expected_output, pp):
+    processed_sample = pp(query)
     anonymizer = Anonymizer()  # Don't load persistent mappings for tests
     anonymized_query = anonymizer.anonymize_query(processed_sample)
     actual = postprocess_text(anonymized_query)
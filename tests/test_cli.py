@@ -1,6 +1,3 @@
-import os
-import tempfile
-
 # import json
 # from unittest.mock import patch, mock_open
 import pytest
@@ -9,6 +6,21 @@ from src.sql_query_anonymizer.cli import AnonymizerCLI, create_parser
 from src.sql_query_anonymizer.utils import Anonymizer
 
 
+@pytest.fixture(scope="class")
+def _shared_cli():
+    """Single AnonymizerCLI, wired to the default mapping file, reused across a class."""
+    cli = AnonymizerCLI()
+    cli.setup_anonymizer()
+    return cli
+
+
+@pytest.fixture
+def cli(_shared_cli):
+    """Fixture to provide the shared AnonymizerCLI with empty mappings for each test."""
+    _shared_cli.setup_anonymizer().clear_mappings()
+    return _shared_cli
+
+
 class TestAnonymizerCLI:
     def test_cli_initialization(self):
         """Test CLI initialization."""
@@ -20,8 +32,7 @@ class TestAnonymizerCLI:
         assert isinstance(anonymizer, Anonymizer)
         assert cli.anonymizer is not None
 
-    def test_anonymize_query_cli(self):
-        cli = AnonymizerCLI()
+    def test_anonymize_query_cli(self, cli):
         query = "SELECT name FROM users WHERE id = 1"
 
         result = cli.anonymize_query(query)
@@ -32,9 +43,7 @@ class TestAnonymizerCLI:
         assert "literal_" in result
         assert "SELECT" in result  # Keywords preserved
 
-    def test_deanonymize_query_cli(self):
-        cli = AnonymizerCLI()
-
+    def test_deanonymize_query_cli(self, cli):
         # First anonymize
         original = "SELECT name FROM users WHERE id = 1"
         anonymized = cli.anonymize_query(original)
@@ -46,50 +55,29 @@ class TestAnonymizerCLI:
         assert "name" in decoded.lower()
         assert "users" in decoded.lower()
 
-    def test_process_file_anonymize(self):
+    def test_process_file_anonymize(self, cli, tmp_path):
         """Test file processing for anonymization."""
-        cli = AnonymizerCLI()
+        input_path = tmp_path / "input.sql"
+        input_path.write_text("SELECT * FROM products WHERE price > 100")
+        output_path = tmp_path / "output.sql"
 
-        with tempfile.NamedTemporaryFile(
-            mode="w", suffix=".sql", delete=False
-        ) as input_file:
-            input_file.write("SELECT * FROM products WHERE price > 100")
-            input_path = input_file.name
-
-        with tempfile.NamedTemporaryFile(
-            mode="w", suffix=".sql", delete=False
-        ) as output_file:
-            output_path = output_file.name
-
-        try:
-            success = cli.process_file(input_path, output_path, "anonymize")
-            assert success
-
-            # Verify output file was written and contains anonymized content
-            with open(output_path, "r") as f:
-                content = f.read()
-                assert "table_" in content or "identifier_" in content
-
-        finally:
-            if os.path.exists(input_path):
-                os.unlink(input_path)
-            if os.path.exists(output_path):
-                os.unlink(output_path)
-
-    def test_mapping_stats(self):
-        """Test mapping statistics display."""
-        cli = AnonymizerCLI()
+        success = cli.process_file(str(input_path), str(output_path), "anonymize")
+        assert success
 
+        # Verify output file was written and contains anonymized content
+        content = output_path.read_text()
+        assert "table_" in content or "identifier_" in content
+
+    def test_mapping_stats(self, cli):
+        """Test mapping statistics display."""
         # Create some mappings
         cli.anonymize_query("SELECT name FROM users")
 
         # Test stats (should not raise exception)
         cli.show_mappings()  # This prints to stdout, just test it doesn't crash
 
-    def test_clear_mappings(self):
+    def test_clear_mappings(self, cli):
         """Test clearing mappings."""
-        cli = AnonymizerCLI()
-
         # Create mappings
         cli.anonymize_query("SELECT name FROM users")
         anonymizer = cli.setup_anonymizer()
@@ -104,10 +92,8 @@ class TestAnonymizerCLI:
         total_mappings = sum(len(m) for m in anonymizer.mappings.values())
         assert total_mappings == 0
 
-    def test_export_import_mappings(self, tmp_path):
+    def test_export_import_mappings(self, cli, tmp_path):
         """Test exporting and importing mappings."""
-        cli = AnonymizerCLI()
-
         # Create some mappings
         cli.anonymize_query("SELECT name, age FROM users WHERE id = 1")
 
@@ -136,6 +122,7 @@ class TestArgumentParser:
     def test_parser_creation(self):
         parser = create_parser()
         assert parser is not None
+        assert create_parser() is parser
 
     def test_anonymize_command_parsing(self):
         parser = create_parser()
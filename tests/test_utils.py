@@ -48,12 +48,42 @@ from src.sql_query_anonymizer.utils import (
             "select name, hire_date from employees where id = 10 and name = ' John ';",
             "select name, hire_date from employees where id = 10 and name = ' John ';",
         ),
+        (
+            "SELECT Note FROM Logs WHERE Msg = 'It\\'s OK' OR Tag = \"A\\\"B\"",
+            "select note from logs where msg = 'It\\'s OK' or tag = \"A\\\"B\"",
+        ),
+        ("SELECT 'Unclosed FROM Users", "select 'unclosed from users"),
     ],
 )
 def test_normalize_casing(input_text, expected_output):
     assert normalize_casing(input_text) == expected_output
 
 
+class _ScanCountingStr(str):
+    """A str that totals how many characters its find calls examine."""
+
+    scanned = 0
+
+    def find(self, sub, start=0, end=None):
+        stop = len(self) if end is None else end
+        index = super().find(sub, start, end)
+        self.scanned += (stop if index == -1 else index + len(sub)) - start
+        return index
+
+
+def test_normalize_casing_large_input_scans_linearly():
+    # Many single-quoted literals and one literal full of escapes; rescanning
+    # for quotes from each literal would make the work grow quadratically
+    rows = ", ".join(f"({i}, 'Name{i}', 'X')" for i in range(2000))
+    escaped = "'" + "\\x" * 2000 + "'"
+    text = _ScanCountingStr(f"INSERT INTO People VALUES {rows}, (0, {escaped}, 'X')")
+
+    result = normalize_casing(text)
+
+    assert result == f"insert into people values {rows}, (0, {escaped}, 'X')"
+    assert text.scanned < 3 * len(text)
+
+
 @pytest.mark.parametrize(
     "input_text, expected_output",
     [
@@ -223,6 +253,151 @@ def test_normalize_keyword_casing(input_text, expected_output):
                 TokenType.SYMBOL,
             ],
         ),
+        (
+            "SELECT o.id FROM\n  orders o INNER JOIN  customers c ON o.cid = c.id",
+            [
+                "SELECT",
+                "o",
+                ".",
+                "id",
+                "FROM",
+                "orders",
+                "o",
+                "INNER JOIN",
+                "customers",
+                "c",
+                "ON",
+                "o",
+                ".",
+                "cid",
+                "=",
+                "c",
+                ".",
+                "id",
+            ],
+            [
+                TokenType.KEYWORD,
+                TokenType.TABLE_ALIAS,
+                TokenType.SYMBOL,
+                TokenType.IDENTIFIER,
+                TokenType.KEYWORD,
+                TokenType.TABLE,
+                TokenType.TABLE_ALIAS,
+                TokenType.KEYWORD,
+                TokenType.TABLE,
+                TokenType.TABLE_ALIAS,
+                TokenType.KEYWORD,
+                TokenType.TABLE_ALIAS,
+                TokenType.SYMBOL,
+                TokenType.IDENTIFIER,
+                TokenType.SYMBOL,
+                TokenType.TABLE_ALIAS,
+                TokenType.SYMBOL,
+                TokenType.IDENTIFIER,
+            ],
+        ),
+        (
+            "SELECT name FROM café WHERE id = 1",
+            ["SELECT", "name", "FROM", "café", "WHERE", "id", "=", "1"],
+            [
+                TokenType.KEYWORD,
+                TokenType.IDENTIFIER,
+                TokenType.KEYWORD,
+                TokenType.TABLE,
+                TokenType.KEYWORD,
+                TokenType.IDENTIFIER,
+                TokenType.SYMBOL,
+                TokenType.LITERAL,
+            ],
+        ),
+        (
+            "INSERT INTO straße (id) VALUES (1)",
+            ["INSERT", "INTO", "straße", "(", "id", ")", "VALUES", "(", "1", ")"],
+            [
+                TokenType.KEYWORD,
+                TokenType.KEYWORD,
+                TokenType.TABLE,
+                TokenType.SYMBOL,
+                TokenType.IDENTIFIER,
+                TokenType.SYMBOL,
+                TokenType.KEYWORD,
+                TokenType.SYMBOL,
+                TokenType.LITERAL,
+                TokenType.SYMBOL,
+            ],
+        ),
+        (
+            "SELECT * FROM 2024_sales s WHERE s.total > 10",
+            [
+                "SELECT",
+                "*",
+                "FROM",
+                "2024_sales",
+                "s",
+                "WHERE",
+                "s",
+                ".",
+                "total",
+                ">",
+                "10",
+            ],
+            [
+                TokenType.KEYWORD,
+                TokenType.SYMBOL,
+                TokenType.KEYWORD,
+                TokenType.TABLE,
+                TokenType.TABLE_ALIAS,
+                TokenType.KEYWORD,
+                TokenType.TABLE_ALIAS,
+                TokenType.SYMBOL,
+                TokenType.IDENTIFIER,
+                TokenType.SYMBOL,
+                TokenType.LITERAL,
+            ],
+        ),
+        (
+            "SELECT * FROM 1_v2.5 WHERE x = 1",
+            ["SELECT", "*", "FROM", "1_v2", ".", "5", "WHERE", "x", "=", "1"],
+            [
+                TokenType.KEYWORD,
+                TokenType.SYMBOL,
+                TokenType.KEYWORD,
+                TokenType.TABLE,
+                TokenType.SYMBOL,
+                TokenType.LITERAL,
+                TokenType.KEYWORD,
+                TokenType.IDENTIFIER,
+                TokenType.SYMBOL,
+                TokenType.LITERAL,
+            ],
+        ),
+        (
+            "SELECT * FROM 2023_q4.2024_sales WHERE x = 1",
+            [
+                "SELECT",
+                "*",
+                "FROM",
+                "2023_q4",
+                ".",
+                "2024_sales",
+                "WHERE",
+                "x",
+                "=",
+                "1",
+            ],
+            [
+                TokenType.KEYWORD,
+                TokenType.SYMBOL,
+                TokenType.KEYWORD,
+                TokenType.TABLE,
+                TokenType.SYMBOL,
+                TokenType.IDENTIFIER,
+                TokenType.KEYWORD,
+                TokenType.IDENTIFIER,
+                TokenType.SYMBOL,
+                TokenType.LITERAL,
+            ],
+        ),
         # (
         #     """-- This is a single line comment
         # SELECT name, hire_date FROM employees e
@@ -263,6 +438,10 @@ def test_tokenize_sql(input_text, expected_tokens, expected_types):
             " select name  from  employees e where hire_date <= getdate() - 7;",
             "SELECT name FROM employees e WHERE hire_date <= GETDATE ( ) - 7 ;",
         ),
+        (
+            "select note from tickets where note = 'Order by Date'",
+            "SELECT note FROM tickets WHERE note = 'Order by Date'",
+        ),
     ],
 )
 def test_preprocess_text(input_text, expected_output):
@@ -301,6 +480,30 @@ def test_preprocess_text(input_text, expected_output):
                 "2025": "literal_4",
             },
         ),
+        (
+            "SELECT name FROM café WHERE id = 1;",
+            "SELECT identifier_1 FROM table_1 WHERE identifier_2 = literal_1 ;",
+            2,
+            {"name": "identifier_1", "id": "identifier_2", "café": "table_1"},
+            1,
+            {"1": "literal_1"},
+        ),
+        (
+            "INSERT INTO straße (id) VALUES (1);",
+            "INSERT INTO table_1 ( identifier_1 ) VALUES ( literal_1 ) ;",
+            1,
+            {"id": "identifier_1", "straße": "table_1"},
+            1,
+            {"1": "literal_1"},
+        ),
+        (
+            "SELECT total FROM 2024_sales WHERE total > 10;",
+            "SELECT identifier_1 FROM table_1 WHERE identifier_1 > literal_1 ;",
+            1,
+            {"total": "identifier_1", "2024_sales": "table_1"},
+            1,
+            {"10": "literal_1"},
+        ),
     ],
 )
 def test_anonymizer_class(
@@ -337,3 +540,9 @@ def test_read_sql_file():
     assert "WHERE order_date >= '2023-01-01'" in sql_content
     assert sql_content.startswith("SELECT")
     assert sql_content.endswith(";")
+
+
+def test_read_sql_file_line_breaks(tmp_path):
+    sql_file = tmp_path / "query.sql"
+    sql_file.write_text("-- header\nSELECT id\x0c  -- note\nFROM users\n")
+    assert read_sql_file(str(sql_file)) == "SELECT id\nFROM users"